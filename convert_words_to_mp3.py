@@ -7,10 +7,34 @@
 
 import asyncio
 import edge_tts
+import hashlib
 import os
+import shutil
 import sys
+import tempfile
+import time
 import argparse
 from pathlib import Path
+from xml.sax.saxutils import escape
+
+# 连接池依赖 edge-tts 的内部接口（已在 7.2 上验证），缺失时退回公开的 Communicate 接口
+try:
+    import aiohttp
+    import certifi
+    import ssl
+    from edge_tts.communicate import (
+        connect_id, date_to_string, get_headers_and_data, mkssml,
+        remove_incompatible_characters, ssml_headers_plus_data,
+    )
+    from edge_tts.constants import SEC_MS_GEC_VERSION, WSS_HEADERS, WSS_URL
+    from edge_tts.data_classes import TTSConfig
+    from edge_tts.drm import DRM
+    from edge_tts.exceptions import NoAudioReceived
+    # 与 edge-tts 的 Communicate 一样使用 certifi 的证书，不依赖系统证书库
+    SSL_CONTEXT = ssl.create_default_context(cafile=certifi.where())
+    HAS_EDGE_TTS_INTERNALS = True
+except ImportError:
+    HAS_EDGE_TTS_INTERNALS = False
 
 
 # 语音设置
@@ -28,13 +52,214 @@ PAUSE_BETWEEN_LANGUAGES = 500
 # 重试次数
 MAX_RETRIES = 3
 
+# 语音缓存目录，按 (语音, 语速, 文本) 的哈希保存已合成的 MP3，为 None 时不使用缓存
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "dualread-voice")
+
+# 同时进行的 TTS 请求数上限（所有文件共享）
+MAX_CONCURRENT_REQUESTS = 8
+# 批量转换时同时处理的文件数
+MAX_PARALLEL_FILES = 4
+
+# 每个 (语音, 语速) 保持的 WebSocket 连接数
+WS_POOL_SIZE = 4
+# 连接空闲超过该时间（秒）后关闭重连
+WS_IDLE_TTL = 30
+# 请求的边界元数据类型: "SentenceBoundary" 或 "WordBoundary"（本工具只使用音频数据）
+TTS_BOUNDARY = "SentenceBoundary"
+
+# 静音帧参数: 24kHz 下每个 MP3 帧 576 个采样 (24 毫秒)，48kbps CBR 每帧 144 字节
+SILENT_FRAME_MS = 24
+SILENT_FRAME_BYTES = 144
+# 一帧静音 MP3 数据，首次生成静音时由 ffmpeg 生成
+SILENT_FRAME = None
+
+
+class TTSConnectionPool:
+    """复用 edge-tts 的 WebSocket 连接，避免每段语音都重新进行 TLS 和 WebSocket 握手
+
+    每个 (语音, 语速) 组合最多保持 WS_POOL_SIZE 条连接，空闲超过 WS_IDLE_TTL 秒的连接关闭后重建。
+    """
+
+    def __init__(self, size: int = WS_POOL_SIZE, idle_ttl: float = WS_IDLE_TTL):
+        self.size = size
+        self.idle_ttl = idle_ttl
+        self._session = None
+        self._pools = {}
+
+    def _get_pool(self, voice: str, rate: str) -> asyncio.Queue:
+        """获取 (语音, 语速) 对应的连接队列，队列中的元素为 (连接或 None, 上次使用时间)"""
+        key = (voice, rate)
+        if key not in self._pools:
+            pool = asyncio.Queue()
+            for _ in range(self.size):
+                pool.put_nowait((None, 0.0))
+            self._pools[key] = pool
+        return self._pools[key]
+
+    async def _connect(self):
+        """建立新的 WebSocket 连接，时钟偏差导致 403 时校正后重试一次"""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                trust_env=True,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=60),
+            )
+        for attempt in range(2):
+            try:
+                return await self._session.ws_connect(
+                    f"{WSS_URL}&ConnectionId={connect_id()}"
+                    f"&Sec-MS-GEC={DRM.generate_sec_ms_gec()}"
+                    f"&Sec-MS-GEC-Version={SEC_MS_GEC_VERSION}",
+                    compress=15,
+                    headers=DRM.headers_with_muid(WSS_HEADERS),
+                    ssl=SSL_CONTEXT,
+                )
+            except aiohttp.ClientResponseError as e:
+                if e.status != 403 or attempt > 0:
+                    raise
+                DRM.handle_client_response_error(e)
+
+    async def synthesize(self, text: str, voice: str, rate: str, output_file: str):
+        """合成一段语音，收到的音频数据直接写入 output_file"""
+        global HAS_EDGE_TTS_INTERNALS
+        if HAS_EDGE_TTS_INTERNALS:
+            try:
+                await self._synthesize_pooled(text, voice, rate, output_file)
+                return
+            except (TypeError, AttributeError) as e:
+                # 内部接口的签名或属性变了，不是网络问题，重试也不会成功，之后都改用公开接口
+                print(f"    警告: edge-tts 内部接口不兼容，改用 Communicate: {e!r}")
+                HAS_EDGE_TTS_INTERNALS = False
+        
+        # 使用公开的 Communicate 接口，每段语音单独建立连接
+        communicate = edge_tts.Communicate(text, voice, rate=rate, boundary=TTS_BOUNDARY)
+        with open(output_file, 'wb') as out:
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    out.write(chunk["data"])
+
+    async def _synthesize_pooled(self, text: str, voice: str, rate: str, output_file: str):
+        """从连接池取出连接合成一段语音"""
+        pool = self._get_pool(voice, rate)
+        websocket, last_used = await pool.get()
+        try:
+            if websocket is not None and (websocket.closed or time.monotonic() - last_used > self.idle_ttl):
+                await websocket.close()
+                websocket = None
+            if websocket is None:
+                websocket = await self._connect()
+            with open(output_file, 'wb') as out:
+                await self._request(websocket, text, voice, rate, out)
+        except BaseException:
+            # 出错的连接状态未知，直接丢弃
+            if websocket is not None:
+                await websocket.close()
+            websocket = None
+            raise
+        finally:
+            pool.put_nowait((websocket, time.monotonic()))
+
+    @staticmethod
+    async def _request(websocket, text: str, voice: str, rate: str, out):
+        """在已建立的连接上发送一次合成请求，边接收边写入 out，读取到 turn.end 为止"""
+        word_boundary = "true" if TTS_BOUNDARY == "WordBoundary" else "false"
+        sentence_boundary = "true" if TTS_BOUNDARY == "SentenceBoundary" else "false"
+        await websocket.send_str(
+            f"X-Timestamp:{date_to_string()}\r\n"
+            "Content-Type:application/json; charset=utf-8\r\n"
+            "Path:speech.config\r\n\r\n"
+            '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+            f'"sentenceBoundaryEnabled":"{sentence_boundary}","wordBoundaryEnabled":"{word_boundary}"'
+            '},"outputFormat":"audio-24khz-48kbitrate-mono-mp3"}}}}\r\n'
+        )
+        tts_config = TTSConfig(voice, rate, "+0%", "+0Hz", TTS_BOUNDARY)
+        ssml = mkssml(tts_config, escape(remove_incompatible_characters(text)))
+        await websocket.send_str(ssml_headers_plus_data(connect_id(), date_to_string(), ssml))
+
+        audio_was_received = False
+        async for received in websocket:
+            if received.type == aiohttp.WSMsgType.TEXT:
+                data = received.data.encode("utf-8")
+                headers, _ = get_headers_and_data(data, data.find(b"\r\n\r\n"))
+                if headers.get(b"Path") == b"turn.end":
+                    break
+            elif received.type == aiohttp.WSMsgType.BINARY:
+                # 二进制消息的前两个字节是头部长度
+                header_length = int.from_bytes(received.data[:2], "big")
+                headers, data = get_headers_and_data(received.data, header_length)
+                if headers.get(b"Path") == b"audio" and data:
+                    out.write(data)
+                    audio_was_received = True
+            elif received.type == aiohttp.WSMsgType.ERROR:
+                raise ConnectionError(f"WebSocket 错误: {received.data}")
+        else:
+            # 服务器在本次合成结束前关闭了连接
+            raise ConnectionError("WebSocket 连接已关闭")
+
+        if not audio_was_received:
+            raise NoAudioReceived(f"没有收到音频数据: {text}")
+
+    async def close(self):
+        """关闭所有连接"""
+        for pool in self._pools.values():
+            while not pool.empty():
+                websocket, _ = pool.get_nowait()
+                if websocket is not None:
+                    await websocket.close()
+        self._pools.clear()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+# 全局连接池和并发限制，所有文件共享
+TTS_POOL = TTSConnectionPool()
+# 信号量在事件循环中首次使用时创建（Python 3.8/3.9 的信号量会绑定创建时的事件循环）
+TTS_SEMAPHORE = None
+
+
+def get_tts_semaphore() -> asyncio.Semaphore:
+    """获取所有文件共享的 TTS 并发限制信号量"""
+    global TTS_SEMAPHORE
+    if TTS_SEMAPHORE is None:
+        TTS_SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    return TTS_SEMAPHORE
+
+
+def get_cache_path(text: str, voice: str):
+    """返回语音对应的缓存文件路径，未启用缓存时返回 None"""
+    if CACHE_DIR is None:
+        return None
+    key = hashlib.sha1(f"{voice}|{RATE}|{text}".encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.mp3")
+
+
+def save_to_cache(audio_file: str, cache_file: str):
+    """将合成好的音频放入缓存，先写临时文件再原子替换，避免留下不完整的缓存"""
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        shutil.copyfile(audio_file, temp_file)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        print(f"    警告: 无法写入缓存 {cache_file}: {e}")
+
 
 async def text_to_speech(text: str, voice: str, output_file: str):
-    """将文本转换为语音并保存为文件，带重试机制"""
+    """将文本转换为语音并保存为文件，带缓存和重试机制"""
+    cache_file = get_cache_path(text, voice)
+    if cache_file is not None and os.path.exists(cache_file):
+        try:
+            shutil.copyfile(cache_file, output_file)
+            return True
+        except OSError as e:
+            # 缓存不可读或刚被删除时重新合成
+            print(f"    警告: 无法读取缓存 {cache_file}: {e}")
+    
     for attempt in range(MAX_RETRIES):
         try:
-            communicate = edge_tts.Communicate(text, voice, rate=RATE)
-            await communicate.save(output_file)
+            await TTS_POOL.synthesize(text, voice, RATE, output_file)
+            if cache_file is not None:
+                save_to_cache(output_file, cache_file)
             return True
         except Exception as e:
             if attempt < MAX_RETRIES - 1:
@@ -43,7 +268,7 @@ async def text_to_speech(text: str, voice: str, output_file: str):
             else:
                 print(f"    警告: 无法生成音频 '{text}': {e}")
                 # 生成一个静音文件作为替代
-                await generate_silence(output_file, 100)
+                generate_silence(output_file, 100)
                 return False
     return False
 
@@ -66,30 +291,23 @@ def parse_word_file(file_path: str) -> list:
     """解析单词文件，返回 [(中文, 英文), ...] 列表
     如果一行只有中文（如文件标题），则英文部分为None
     """
-    words = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line or line.startswith('#'):  # 跳过空行和注释
-                continue
-            
-            # 用空格分割，第一部分是中文，其余是英文
-            parts = line.split(None, 1)  # 最多分成2部分
-            if len(parts) >= 2:
-                chinese, english = parts[0], parts[1]
-                words.append((chinese, english))
-            elif len(parts) == 1:
-                # 只有中文（如文件标题），英文为None
-                words.append((parts[0], None))
-    
-    return words
+    lines = (line.strip() for line in Path(file_path).read_text(encoding='utf-8').splitlines())
+    # 跳过空行和注释，用空格分割，第一部分是中文，其余是英文
+    return [
+        (parts[0], parts[1] if len(parts) > 1 else None)
+        for parts in (line.split(None, 1) for line in lines if line and not line.startswith('#'))
+    ]
 
 
-async def convert_file_to_mp3(input_file: str, output_file: str = None):
+async def convert_file_to_mp3(input_file: str, output_file: str = None, temp_dir: str = None):
     """将单词列表文件转换为 MP3"""
-    import tempfile
     import subprocess
     
+    if temp_dir is None:
+        # 单独转换一个文件时使用自己的临时目录
+        with tempfile.TemporaryDirectory() as temp_dir:
+            return await convert_file_to_mp3(input_file, output_file, temp_dir)
+    
     # 确定输出文件名
     if output_file is None:
         output_file = os.path.splitext(input_file)[0] + ".mp3"
@@ -105,104 +323,151 @@ async def convert_file_to_mp3(input_file: str, output_file: str = None):
     
     print(f"共找到 {len(words)} 个单词")
     
-    # 创建临时目录
-    with tempfile.TemporaryDirectory() as temp_dir:
-        audio_files = []
-        silence_file = os.path.join(temp_dir, "silence.mp3")
-        short_silence_file = os.path.join(temp_dir, "short_silence.mp3")
-        
-        # 生成静音文件
-        await generate_silence(silence_file, PAUSE_BETWEEN_WORDS)
-        await generate_silence(short_silence_file, PAUSE_BETWEEN_LANGUAGES)
-        
-        # 处理每个单词
-        for i, (chinese, english) in enumerate(words):
-            if english is None:
-                # 只有中文（如文件标题）
-                print(f"处理中 ({i+1}/{len(words)}): {chinese}")
-                chinese_file = os.path.join(temp_dir, f"word_{i}_zh.mp3")
-                await text_to_speech(chinese, CHINESE_VOICE, chinese_file)
-                audio_files.append(chinese_file)
-            else:
-                # 中英双语
-                print(f"处理中 ({i+1}/{len(words)}): {chinese} - {english}")
-                chinese_file = os.path.join(temp_dir, f"word_{i}_zh.mp3")
-                english_file = os.path.join(temp_dir, f"word_{i}_en.mp3")
-                
-                # 生成中英文音频
-                await asyncio.gather(
-                    text_to_speech(chinese, CHINESE_VOICE, chinese_file),
-                    text_to_speech(english, ENGLISH_VOICE, english_file)
-                )
-                
-                # 添加到文件列表: 中文 + 短停顿 + 英文
-                audio_files.append(chinese_file)
-                audio_files.append(short_silence_file)
-                audio_files.append(english_file)
-            
-            # 单词之间加长停顿（最后一个除外）
-            if i < len(words) - 1:
-                audio_files.append(silence_file)
+    # 音频列表中的元素为单词音频文件路径，或直接写入输出的静音数据 (bytes)
+    audio_files = []
+    silence = silence_bytes(PAUSE_BETWEEN_WORDS)
+    short_silence = silence_bytes(PAUSE_BETWEEN_LANGUAGES)
+    
+    # 按朗读顺序排列文件列表，同时收集所有需要合成的语音
+    tasks = []
+    # 单词音频以输入文件名为前缀，多个文件共享临时目录时不会冲突
+    prefix = f"{temp_dir}{os.sep}{Path(input_file).stem}_"
+    for i, (chinese, english) in enumerate(words):
+        # 只有中文（如文件标题）时只合成中文
+        chinese_file = f"{prefix}word_{i}_zh.mp3"
+        tasks.append((chinese, CHINESE_VOICE, chinese_file))
+        audio_files.append(chinese_file)
+        if english is not None:
+            # 中英双语: 中文 + 短停顿 + 英文
+            english_file = f"{prefix}word_{i}_en.mp3"
+            tasks.append((english, ENGLISH_VOICE, english_file))
+            audio_files.append(short_silence)
+            audio_files.append(english_file)
         
-        # 合并所有音频文件
-        print("正在合并音频文件...")
-        await merge_audio_files(audio_files, output_file, temp_dir)
+        # 单词之间加长停顿（最后一个除外）
+        if i < len(words) - 1:
+            audio_files.append(silence)
+    
+    # 并发生成所有语音，用全局信号量限制同时进行的请求数
+    done = 0
+    
+    async def bounded_tts(text: str, voice: str, path: str):
+        nonlocal done
+        async with get_tts_semaphore():
+            await text_to_speech(text, voice, path)
+        done += 1
+        print(f"处理中 [{Path(input_file).name}] ({done}/{len(tasks)}): {text}")
+    
+    await asyncio.gather(*(bounded_tts(*task) for task in tasks))
+    
+    # 合并所有音频文件
+    print("正在合并音频文件...")
+    # 在线程中拼接，避免阻塞事件循环中其他文件的语音接收
+    await asyncio.get_running_loop().run_in_executor(None, merge_audio_files, audio_files, output_file)
+    
+    # 删除本文件的单词音频，临时目录留给后续文件继续使用
+    for _, _, path in tasks:
+        os.remove(path)
     
     print(f"转换完成: {output_file}")
     return True
 
 
-async def generate_silence(output_file: str, duration_ms: int):
-    """生成指定时长的静音文件"""
-    # 使用 ffmpeg 生成静音
+def load_silent_frame() -> bytes:
+    """使用 ffmpeg 生成一帧静音 MP3 数据（整个运行期间只调用一次）"""
     import subprocess
-    duration_sec = duration_ms / 1000
     cmd = [
-        "ffmpeg", "-y", "-f", "lavfi",
-        "-i", f"anullsrc=r=24000:cl=mono",
-        "-t", str(duration_sec),
-        "-q:a", "9",
-        output_file
+        "ffmpeg", "-f", "lavfi",
+        "-i", "anullsrc=r=24000:cl=mono",
+        "-t", "1",
+        "-c:a", "libmp3lame", "-ar", "24000", "-ac", "1", "-b:a", "48k",
+        # 关闭比特池使每帧可独立重复；不写 ID3/Xing 头，使帧从偏移 0 开始对齐
+        "-reservoir", "0", "-write_xing", "0", "-id3v2_version", "0",
+        "-f", "mp3", "pipe:1"
     ]
-    subprocess.run(cmd, capture_output=True, check=True)
+    data = subprocess.run(cmd, capture_output=True, check=True).stdout
+    # 取中间的一帧，避开编码器开头和结尾的过渡帧
+    middle = len(data) // SILENT_FRAME_BYTES // 2 * SILENT_FRAME_BYTES
+    return data[middle:middle + SILENT_FRAME_BYTES]
 
 
-async def merge_audio_files(audio_files: list, output_file: str, temp_dir: str):
-    """使用 ffmpeg 合并多个音频文件"""
-    import subprocess
-    
-    # 创建文件列表
-    list_file = os.path.join(temp_dir, "filelist.txt")
-    with open(list_file, 'w', encoding='utf-8') as f:
+def silence_bytes(duration_ms: int) -> bytes:
+    """返回指定时长的静音 MP3 数据（重复同一帧静音数据，不再调用 ffmpeg）"""
+    global SILENT_FRAME
+    if SILENT_FRAME is None:
+        SILENT_FRAME = load_silent_frame()
+    return SILENT_FRAME * max(1, duration_ms // SILENT_FRAME_MS)
+
+
+def generate_silence(output_file: str, duration_ms: int):
+    """生成指定时长的静音文件"""
+    with open(output_file, 'wb') as f:
+        f.write(silence_bytes(duration_ms))
+
+
+def skip_id3v2(f):
+    """跳过文件开头的 ID3v2 标签，避免标签数据夹在拼接后的音频帧之间"""
+    header = f.read(10)
+    if len(header) == 10 and header[:3] == b"ID3":
+        # 标签长度由 4 个各 7 位有效的字节表示，不含 10 字节头部；带 footer 时再加 10 字节
+        size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        if header[5] & 0x10:
+            size += 10
+        f.seek(10 + size)
+    else:
+        f.seek(0)
+
+
+def merge_audio_files(audio_files: list, output_file: str):
+    """合并多个音频文件
+    所有片段都是相同参数的 CBR MP3，直接按顺序拼接音频帧即可，无需调用 ffmpeg
+    列表元素为文件路径时拷贝文件内容，为 bytes 时（静音数据）直接写入
+    """
+    with open(output_file, 'wb') as out:
         for audio_file in audio_files:
-            f.write(f"file '{audio_file}'\n")
-    
-    # 使用 ffmpeg 合并
-    cmd = [
-        "ffmpeg", "-y", "-f", "concat", "-safe", "0",
-        "-i", list_file,
-        "-c:a", "libmp3lame", "-q:a", "2",
-        output_file
-    ]
-    subprocess.run(cmd, capture_output=True, check=True)
+            if isinstance(audio_file, bytes):
+                out.write(audio_file)
+                continue
+            with open(audio_file, 'rb') as f:
+                skip_id3v2(f)
+                shutil.copyfileobj(f, out, 1 << 20)
 
 
-async def process_directory(directory: str):
-    """处理目录下所有的 .txt 文件"""
+async def process_directory(directory: str) -> int:
+    """处理目录下所有的 .txt 文件，返回处理失败的文件数"""
     txt_files = list(Path(directory).glob("*.txt"))
     if not txt_files:
         print(f"在目录 {directory} 中没有找到 .txt 文件")
-        return
+        return 0
     
     print(f"找到 {len(txt_files)} 个 txt 文件")
     
-    for txt_file in txt_files:
-        await convert_file_to_mp3(str(txt_file))
-        print()
+    # 多个文件同时处理，共享全局的 TTS 并发限制和连接池，以及同一个临时目录
+    file_semaphore = asyncio.Semaphore(MAX_PARALLEL_FILES)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        async def bounded_convert(txt_file: Path):
+            async with file_semaphore:
+                await convert_file_to_mp3(str(txt_file), temp_dir=temp_dir)
+                print()
+        
+        results = await asyncio.gather(
+            *(bounded_convert(txt_file) for txt_file in txt_files),
+            return_exceptions=True
+        )
+    failed = 0
+    for txt_file, result in zip(txt_files, results):
+        # 取消和中断不算单个文件失败，继续向上抛出
+        if isinstance(result, (asyncio.CancelledError, KeyboardInterrupt)):
+            raise result
+        if isinstance(result, BaseException):
+            print(f"错误: 处理 {txt_file} 失败: {result!r}")
+            failed += 1
+    return failed
 
 
 async def main():
-    global CHINESE_VOICE, ENGLISH_VOICE
+    global CHINESE_VOICE, ENGLISH_VOICE, CACHE_DIR
     
     parser = argparse.ArgumentParser(
         description="使用 Edge-TTS 将单词列表文件转换为 MP3",
@@ -225,6 +490,8 @@ async def main():
     parser.add_argument("--zh-voice", default=CHINESE_VOICE, help=f"中文语音 (默认: {CHINESE_VOICE})")
     parser.add_argument("--en-voice", default=ENGLISH_VOICE, help=f"英文语音 (默认: {ENGLISH_VOICE})")
     parser.add_argument("--list-voices", action="store_true", help="列出所有可用的语音")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help=f"语音缓存目录 (默认: {CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true", help="不使用语音缓存")
     
     args = parser.parse_args()
     
@@ -245,22 +512,31 @@ async def main():
     # 更新语音设置
     CHINESE_VOICE = args.zh_voice
     ENGLISH_VOICE = args.en_voice
-    
-    # 处理目录
-    if args.directory:
-        await process_directory(args.directory)
-        return
+    CACHE_DIR = None if args.no_cache else args.cache_dir
     
     # 处理单个文件
-    if not args.input:
+    if not args.directory and not args.input:
         parser.print_help()
         return
     
-    if not os.path.exists(args.input):
+    if not args.directory and not os.path.exists(args.input):
         print(f"错误: 文件不存在: {args.input}")
         sys.exit(1)
     
-    await convert_file_to_mp3(args.input, args.output)
+    failed = 0
+    try:
+        # 处理目录
+        if args.directory:
+            failed = await process_directory(args.directory)
+        else:
+            await convert_file_to_mp3(args.input, args.output)
+    finally:
+        await TTS_POOL.close()
+    
+    # 有文件处理失败时以非零状态退出，便于脚本和 CI 判断
+    if failed:
+        print(f"错误: {failed} 个文件处理失败")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
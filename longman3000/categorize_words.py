@@ -7,7 +7,9 @@
 
 import os
 import json
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # 使用nltk进行词义分析
 try:
@@ -23,15 +25,13 @@ except ImportError:
 # 使用deep_translator进行翻译（免费且稳定）
 try:
     from deep_translator import GoogleTranslator
+    from deep_translator.exceptions import TooManyRequests
 except ImportError:
     print("正在安装deep_translator...")
     import subprocess
     subprocess.check_call(['pip', 'install', 'deep-translator'])
     from deep_translator import GoogleTranslator
-
-# 下载必要的wordnet数据
-nltk.download('wordnet', quiet=True)
-nltk.download('omw-1.4', quiet=True)
+    from deep_translator.exceptions import TooManyRequests
 
 # 定义WordNet顶级语义域到中文的映射
 # WordNet使用lexicographer files来组织同义词集
@@ -136,6 +136,9 @@ CATEGORY_MERGE = {
     '副词': '程度方式',
 }
 
+# 语义域直接到合并后类别的映射，每个单词只需查一次表
+LEXNAME_TO_MERGED = {k: CATEGORY_MERGE.get(v, v) for k, v in LEXNAME_TO_CHINESE.items()}
+
 
 def get_word_category(word):
     """获取单词的语义类别"""
@@ -154,25 +157,54 @@ def get_word_category(word):
     primary_synset = synsets[0]
     lexname = primary_synset.lexname()
     
-    # 映射到中文类别
-    chinese_cat = LEXNAME_TO_CHINESE.get(lexname, '其他')
-    # 合并到更大的类别
-    merged_cat = CATEGORY_MERGE.get(chinese_cat, chinese_cat)
-    
-    return merged_cat
+    # 映射到合并后的中文类别
+    return LEXNAME_TO_MERGED.get(lexname, '其他')
 
 
 def load_words(filepath):
     """从文件加载单词列表，去除重复"""
-    words = []
-    seen = set()
     with open(filepath, 'r', encoding='utf-8-sig') as f:  # utf-8-sig 自动处理BOM
-        for line in f:
-            word = line.strip()
-            if word and word not in seen:
-                words.append(word)
-                seen.add(word)
-    return words
+        # dict.fromkeys 保留首次出现的顺序并去重
+        return list(dict.fromkeys(word for word in (line.strip() for line in f) if word))
+
+
+# 并发翻译的线程数
+TRANSLATE_WORKERS = 8
+# 被限流（429）时的最大重试次数
+TRANSLATE_MAX_RETRIES = 5
+
+
+def translate_with_retry(translator, text):
+    """调用翻译接口，被限流时按指数退避重试"""
+    for attempt in range(TRANSLATE_MAX_RETRIES):
+        try:
+            return translator.translate(text)
+        except TooManyRequests:
+            if attempt == TRANSLATE_MAX_RETRIES - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+
+def translate_batch(batch):
+    """翻译一批单词，返回 [(单词, 翻译), ...]"""
+    # 每批使用独立的翻译器，避免多个线程共享请求参数
+    translator = GoogleTranslator(source='en', target='zh-CN')
+    try:
+        # 用换行符连接进行批量翻译
+        text = '\n'.join(batch)
+        result = translate_with_retry(translator, text)
+        translated = result.split('\n')
+        return [(word, trans.strip()) for word, trans in zip(batch, translated)]
+    except Exception as e:
+        print(f"批量翻译失败，尝试逐个翻译: {e}")
+        # 逐个翻译
+        pairs = []
+        for word in batch:
+            try:
+                pairs.append((word, translate_with_retry(translator, word)))
+            except:
+                pairs.append((word, word))  # 翻译失败则保留原文
+        return pairs
 
 
 def translate_words(words, cache_file=None):
@@ -193,55 +225,55 @@ def translate_words(words, cache_file=None):
     
     if words_to_translate:
         print(f"正在翻译 {len(words_to_translate)} 个单词...")
-        translator = GoogleTranslator(source='en', target='zh-CN')
-        
-        # 批量翻译，每批50个
+        # 批量翻译，每批50个，多批并发请求
         batch_size = 50
-        for i in range(0, len(words_to_translate), batch_size):
-            batch = words_to_translate[i:i+batch_size]
-            try:
-                # 用换行符连接进行批量翻译
-                text = '\n'.join(batch)
-                result = translator.translate(text)
-                translated = result.split('\n')
-                
-                for word, trans in zip(batch, translated):
-                    translations[word] = trans.strip()
-                
-                if (i + batch_size) % 200 == 0:
-                    print(f"  已翻译 {min(i + batch_size, len(words_to_translate))} / {len(words_to_translate)}")
-            except Exception as e:
-                print(f"批量翻译失败，尝试逐个翻译: {e}")
-                # 逐个翻译
-                for word in batch:
-                    try:
-                        trans = translator.translate(word)
-                        translations[word] = trans
-                    except:
-                        translations[word] = word  # 翻译失败则保留原文
+        batches = [words_to_translate[i:i+batch_size] for i in range(0, len(words_to_translate), batch_size)]
+        with ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS) as executor:
+            # executor.map 按提交顺序返回结果
+            for n, pairs in enumerate(executor.map(translate_batch, batches), 1):
+                translations.update(pairs)
+                if (n * batch_size) % 200 == 0:
+                    print(f"  已翻译 {min(n * batch_size, len(words_to_translate))} / {len(words_to_translate)}")
         
         # 保存缓存
         if cache_file:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(translations, f, ensure_ascii=False, indent=2)
+            # 先写临时文件再替换，中途崩溃也不会损坏已有缓存
+            temp_file = cache_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(translations, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file, cache_file)
             print(f"翻译缓存已保存到 {cache_file}")
     
     return translations
 
 
+# 单词数达到该值时才用多进程分类；每个子进程都要启动并加载一遍WordNet，
+# 朗文3000这样的词表串行查询更快
+PARALLEL_CATEGORIZE_MIN_WORDS = 20000
+
+
+def init_wordnet_worker():
+    """加载WordNet，避免首次查询时才触发惰性加载（也用作进程池的初始化函数）"""
+    wn.ensure_loaded()
+
+
 def categorize_words(words):
-    """将单词分类"""
+    """将单词分类，单词很多时用多个进程并行查询WordNet"""
     categories = defaultdict(list)
-    uncategorized = []
     
-    for word in words:
-        category = get_word_category(word)
-        if category:
-            categories[category].append(word)
-        else:
-            uncategorized.append(word)
+    if len(words) < PARALLEL_CATEGORIZE_MIN_WORDS:
+        init_wordnet_worker()
+        word_categories = [get_word_category(word) for word in words]
+    else:
+        with ProcessPoolExecutor(initializer=init_wordnet_worker) as executor:
+            # executor.map 按输入顺序返回结果
+            word_categories = list(executor.map(get_word_category, words, chunksize=256))
+    
+    for word, category in zip(words, word_categories):
+        # 找不到词义的单词直接归入未分类词汇
+        categories[category or '未分类词汇'].append(word)
     
-    return categories, uncategorized
+    return categories
 
 
 def split_large_categories(categories, max_size=60):
@@ -299,6 +331,10 @@ def main():
     # 翻译缓存文件
     cache_file = os.path.join(script_dir, 'translations_cache.json')
     
+    # 下载必要的wordnet数据（放在 main 中，避免进程池的子进程导入模块时重复下载）
+    nltk.download('wordnet', quiet=True)
+    nltk.download('omw-1.4', quiet=True)
+    
     print("正在加载单词...")
     words = load_words(input_file)
     print(f"共加载 {len(words)} 个单词")
@@ -307,16 +343,12 @@ def main():
     translations = translate_words(words, cache_file)
     
     print("\n正在分析单词词义并分类...")
-    categories, uncategorized = categorize_words(words)
+    categories = categorize_words(words)
     
     print(f"\n分类统计:")
     for cat_name, cat_words in sorted(categories.items(), key=lambda x: -len(x[1])):
         print(f"  {cat_name}: {len(cat_words)} 个单词")
     
-    if uncategorized:
-        print(f"  未分类: {len(uncategorized)} 个单词")
-        categories['未分类词汇'] = uncategorized
-    
     print("\n正在拆分大类别（每类不超过60个）...")
     final_categories = split_large_categories(categories, max_size=60)
     